@@ -1,9 +1,114 @@
 import pandas as pd
-from typing import Dict, List, Union
+import numpy as np
+from typing import Any, Dict, List, Tuple, Union
 import logging
+import textwrap
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from data_processor_kernels import count_by_code, latest_by_code, mean_by_code
 
 logger = logging.getLogger(__name__)
 
+# Columns every assessment export must contain, besides Notes or Comments
+REQUIRED_COLUMNS = frozenset({
+    'Group Names', 'Entity Name', 'Capability Name', 'Template Name',
+    'Assessment Date', 'Assessment Number', 'Rating',
+    'Criteria', 'Criteria Stage'
+})
+
+# Below this many rows, thread start-up costs more than the aggregations it would overlap
+PARALLEL_MIN_ROWS = 100_000
+
+# Static prompt text is dedented and stored once at import; only the substitutions run per call
+_PROMPT_HEADER = textwrap.dedent("""
+    Analyze the following assessment data for {group_or_entity}: {name}
+    Group: {group}
+
+    Template Name(s): {templates}
+    Assessment Date(s): {dates}
+    Assessment Number(s): {numbers}
+    Total Number of Assessments Analyzed: {total}
+
+    Please provide the following analysis in this order:
+
+    1. Comprehensive Notes Summary and Sentiment Analysis:
+    Start with a detailed summary of all notes across all capabilities and assessments. This should include:
+    - A chronological overview of the notes, highlighting key themes and changes over time
+    - Direct quotes from the notes that illustrate important points or shifts in focus
+    - An analysis of the overall sentiment in the notes, including how it has changed over time
+    - Specific examples of positive and negative sentiments, supported by quotes
+    - An interpretation of what these sentiments suggest about the entity's progress and challenges
+    If there are no notes for a particular capability or assessment, mention this fact in your analysis.
+
+    2. A concise summary of the overall performance across all capabilities, highlighting key improvements and areas of concern.
+
+    3. A focused analysis of progress over time, mentioning only capabilities with significant changes.
+
+    4. Top 3 strengths and top 3 areas for improvement, based on the most recent ratings and progress over time.
+
+    5. Detailed Analysis of Capabilities with Notes:
+    For each capability with notes, provide:
+    - The capability name and its most recent rating
+    - A chronological summary of all notes for this capability, including direct quotes
+    - Your interpretation of how the notes relate to the rating and how they've changed over time
+    - A specific recommendation based on the notes and rating
+
+    6. Summary Analysis of Capabilities without Notes:
+    For capabilities without notes, provide:
+    - The capability name and its most recent rating
+    - An analysis based on the criteria for the current score and what's needed for a higher score
+    - A specific recommendation for improvement
+
+    7. 3-5 specific, actionable recommendations for future focus areas, based on the identified weaknesses and the content of the notes.
+
+    Capabilities with notes:
+    """).lstrip()
+
+_CAPABILITY_HEADER = "\nCapability: {capability}\nMost Recent Rating: {rating:.2f}\n"
+
+_NOTES_HEADER = "Notes Over Time:\n\n"
+
+_NOTE_ENTRY = "    Assessment Number: {number}\n    Date: {date}\n    Notes: {note}\n\n"
+
+_CRITERIA = "Criteria: {criteria}\nCriteria Stage: {stages}\n"
+
+_WITHOUT_NOTES_HEADER = "\nCapabilities without notes:\n"
+
+_PROMPT_FOOTER = textwrap.dedent("""
+    Please provide a focused analysis based on this data, avoiding redundancies and emphasizing insights from the notes and criteria.
+    Ensure that your analysis includes specific ratings, meaningful quotes from notes where available, and clear, actionable recommendations.
+    For capabilities without notes, base your analysis on the criteria and current rating, explaining what's needed for improvement.
+
+    In the Comprehensive Notes Summary and Sentiment Analysis section, provide a detailed overview of all notes, their sentiment, and how they've evolved over time.
+    Use specific quotes to support your analysis and highlight any significant trends or changes in sentiment across different capabilities and assessments.
+    If a capability has no notes, include this information in your analysis and consider what this lack of notes might imply.
+    """)
+
+# The sentiment goes on a trailing line so a response cut off at max_tokens is still readable prose
+_STRUCTURED_RESPONSE = textwrap.dedent("""
+    Write the analysis as plain text. End your answer with one final line, with nothing after it, in the form:
+    Sentiment: <positive, negative, or neutral> - <a brief explanation of the overall sentiment of the notes>
+    """)
+
+def _build_row_index(column: pd.Series) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Index the row positions of every distinct value in a column.
+
+    The rows are stably sorted by value code, so the rows of code c are
+    order[starts[c]:starts[c + 1]], in their original order.
+
+    Parameters:
+    column (pd.Series): The column to index.
+
+    Returns:
+    Tuple[Dict[str, int], np.ndarray, np.ndarray]: The code of each value,
+    the row positions sorted by code, and the start offset of each code.
+    """
+    codes, uniques = pd.factorize(column)
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {value: code for code, value in enumerate(uniques)}, order, starts
+
 class DataProcessor:
     def __init__(self, data: pd.DataFrame):
         """
@@ -14,6 +119,28 @@ class DataProcessor:
         """
         self.data = data
         self._validate_data()
+        # Unique names are computed once; on categorical columns this runs over the integer codes
+        self._entities = self.data['Entity Name'].unique().tolist()
+        self._groups = self.data['Group Names'].unique().tolist()
+        # Row positions per entity and per group, as one sorted index array per key column
+        self._entity_index = _build_row_index(self.data['Entity Name'])
+        self._group_index = _build_row_index(self.data['Group Names'])
+        # Factorize the aggregated columns once so the compiled kernels work on integer codes.
+        # Capabilities are factorized as plain values so the codes follow name order, not category order
+        self._capability_codes, self._capabilities = pd.factorize(np.asarray(self.data['Capability Name']), sort=True)
+        self._stage_codes, self._stages = pd.factorize(self.data['Criteria Stage'])
+        # Keep the columns the getters read as plain arrays to skip pandas indexing per call
+        self._ratings = self.data['Rating'].to_numpy(np.float64)
+        self._assessment_numbers = self.data['Assessment Number'].to_numpy()
+        self._notes = self.data['Notes'].to_numpy()
+        self._dates = self.data['Assessment Date'].to_numpy()
+        self._templates = self.data['Template Name'].to_numpy()
+        self._filter_cache: Dict[Tuple[str, bool], pd.DataFrame] = {}
+        self._summary_cache: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+        # Record type for get_assessment_data; spaces become underscores so fields read as attributes
+        self._record_type = namedtuple('Assessment', [str(col).replace(' ', '_') for col in self.data.columns], rename=True)
+        self._records_cache: Dict[Tuple[str, bool], List[Tuple]] = {}
+        self._prompt_cache: Dict[Tuple[str, str, bool], str] = {}
 
     def _validate_data(self):
         """
@@ -23,27 +150,24 @@ class DataProcessor:
         Raises:
         ValueError: If any required columns are missing from the DataFrame.
         """
-        base_required_columns = [
-            'Group Names', 'Entity Name', 'Capability Name', 'Template Name',
-            'Assessment Date', 'Assessment Number', 'Rating',
-            'Criteria', 'Criteria Stage'
-        ]
-        
+        columns = frozenset(self.data.columns)
+
         # Check if either Notes or Comments exists
-        notes_present = 'Notes' in self.data.columns or 'Comments' in self.data.columns
+        notes_present = 'Notes' in columns or 'Comments' in columns
         if not notes_present:
             logger.error("Missing both 'Notes' and 'Comments' columns")
             raise ValueError("Missing both 'Notes' and 'Comments' columns")
 
         # Check other required columns
-        missing_columns = [col for col in base_required_columns if col not in self.data.columns]
+        missing_columns = sorted(REQUIRED_COLUMNS - columns)
         if missing_columns:
             logger.error(f"Missing required columns: {', '.join(missing_columns)}")
             raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
 
         # Standardize column name to Notes if Comments is present
-        if 'Comments' in self.data.columns and 'Notes' not in self.data.columns:
-            self.data = self.data.rename(columns={'Comments': 'Notes'})
+        if 'Comments' in columns and 'Notes' not in columns:
+            # copy=False relabels the column without copying the data or mutating the caller's frame
+            self.data = self.data.rename(columns={'Comments': 'Notes'}, copy=False)
 
     def get_entities(self) -> List[str]:
         """
@@ -53,7 +177,7 @@ class DataProcessor:
         List[str]: A list of unique entity names.
         """
         logger.debug("Retrieving entities")
-        return self.data['Entity Name'].unique().tolist()
+        return self._entities
 
     def get_groups(self) -> List[str]:
         """
@@ -63,27 +187,163 @@ class DataProcessor:
         List[str]: A list of unique group names.
         """
         logger.debug("Retrieving groups")
-        return self.data['Group Names'].unique().tolist()
+        return self._groups
 
-    def get_assessment_data(self, entity_or_group: str, is_group: bool = False) -> List[Dict]:
+    def _rows(self, entity_or_group: str, is_group: bool = False) -> np.ndarray:
         """
-        Retrieve assessment data for a specific entity or group.
+        Retrieve the row positions for a specific entity or group.
 
         Parameters:
         entity_or_group (str): The name of the entity or group.
         is_group (bool): Whether to filter by group or entity.
 
         Returns:
-        List[Dict]: A list of dictionaries containing the assessment data.
+        np.ndarray: The positions of the rows, empty if the name is unknown.
         """
+        lookup, order, starts = self._group_index if is_group else self._entity_index
+        code = lookup.get(entity_or_group)
+        if code is None:
+            return order[:0]
+        return order[starts[code]:starts[code + 1]]
+
+    def get_assessment_frame(self, entity_or_group: str, is_group: bool = False) -> pd.DataFrame:
+        """
+        Retrieve assessment data for a specific entity or group as a DataFrame.
+        Row positions come from the partition built at initialization and
+        the slice is cached so repeated accessors only extract it once.
+
+        Parameters:
+        entity_or_group (str): The name of the entity or group.
+        is_group (bool): Whether to filter by group or entity.
+
+        Returns:
+        pd.DataFrame: The rows belonging to the entity or group.
+        """
+        logger.debug(f"Getting assessment frame for {'group' if is_group else 'entity'}: {entity_or_group}")
+        key = (entity_or_group, is_group)
+        if key not in self._filter_cache:
+            rows = self._rows(entity_or_group, is_group)
+            if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+                # Exports are ordered by entity, so a selection is usually one contiguous block
+                # that can be sliced without copying
+                self._filter_cache[key] = self.data.iloc[rows[0]:rows[-1] + 1]
+            else:
+                self._filter_cache[key] = self.data.iloc[rows]
+        return self._filter_cache[key]
+
+    def _progress(self, rows: np.ndarray) -> pd.Series:
+        """
+        Average the ratings per assessment number for the given rows.
+        Rows are sorted by assessment number and each run is summed with np.add.reduceat.
+
+        Parameters:
+        rows (np.ndarray): The row positions to aggregate.
+
+        Returns:
+        pd.Series: The mean rating per assessment number, in ascending order.
+        """
+        numbers = self._assessment_numbers[rows]
+        ratings = self._ratings[rows]
+        present = ~pd.isna(numbers)
+        numbers, ratings = numbers[present], ratings[present]
+        order = np.argsort(numbers, kind='stable')
+        numbers, ratings = numbers[order], ratings[order]
+        if not len(numbers):
+            return pd.Series([], index=pd.Index(numbers, name='Assessment Number'), name='Rating', dtype=np.float64)
+
+        starts = np.flatnonzero(np.concatenate(([True], numbers[1:] != numbers[:-1])))
+        rated = ~np.isnan(ratings)
+        sums = np.add.reduceat(np.where(rated, ratings, 0.0), starts)
+        counts = np.add.reduceat(rated.astype(np.int64), starts)
+        means = np.divide(sums, counts, out=np.full(len(starts), np.nan), where=counts > 0)
+        return pd.Series(means, index=pd.Index(numbers[starts], name='Assessment Number'), name='Rating')
+
+    def _capability_scores(self, rows: np.ndarray) -> Dict[str, float]:
+        """
+        Average the ratings per capability for the given rows.
+
+        Parameters:
+        rows (np.ndarray): The row positions to aggregate.
+
+        Returns:
+        Dict[str, float]: The mean rating per capability present in the rows, in name order.
+        """
+        codes = self._capability_codes[rows]
+        n_codes = len(self._capabilities)
+        present = count_by_code(codes, n_codes) > 0
+        means = mean_by_code(codes, self._ratings[rows], n_codes)
+        return {capability: float(mean) for capability, mean, seen in zip(self._capabilities, means, present) if seen}
+
+    def _criteria_distribution(self, rows: np.ndarray) -> Dict[str, int]:
+        """
+        Count the rows per criteria stage for the given rows.
+
+        Parameters:
+        rows (np.ndarray): The row positions to count.
+
+        Returns:
+        Dict[str, int]: The number of rows per criteria stage present in the rows, most frequent first.
+        """
+        counts = count_by_code(self._stage_codes[rows], len(self._stages))
+        order = np.argsort(-counts, kind='stable')
+        return {self._stages[code]: int(counts[code]) for code in order if counts[code] > 0}
+
+    def _compute_all(self, entity_or_group: str, is_group: bool = False) -> Dict[str, Any]:
+        """
+        Compute every per-selection aggregation in a single pass over the selected rows.
+        Results are cached so the public accessors become dictionary lookups.
+
+        Parameters:
+        entity_or_group (str): The name of the entity or group.
+        is_group (bool): Whether to filter by group or entity.
+
+        Returns:
+        Dict[str, Any]: The progress, capability scores, criteria distribution,
+        notes, assessment dates and template names for the selection.
+        """
+        key = (entity_or_group, is_group)
+        if key not in self._summary_cache:
+            rows = self._rows(entity_or_group, is_group)
+            reductions = {
+                'progress': lambda: self._progress(rows),
+                'capability_scores': lambda: self._capability_scores(rows),
+                'criteria_distribution': lambda: self._criteria_distribution(rows),
+            }
+            if len(rows) >= PARALLEL_MIN_ROWS:
+                # The numpy reductions and compiled kernels release the GIL, so large slices reduce concurrently
+                with ThreadPoolExecutor(max_workers=len(reductions)) as executor:
+                    futures = {name: executor.submit(reduction) for name, reduction in reductions.items()}
+                    summary = {name: future.result() for name, future in futures.items()}
+            else:
+                summary = {name: reduction() for name, reduction in reductions.items()}
+            notes = self._notes[rows]
+            summary['notes'] = notes[pd.notna(notes)]
+            summary['assessment_dates'] = pd.unique(self._dates[rows])
+            summary['template_names'] = pd.unique(self._templates[rows])
+            self._summary_cache[key] = summary
+        return self._summary_cache[key]
+
+    def get_assessment_data(self, entity_or_group: str, is_group: bool = False) -> List[Tuple]:
+        """
+        Retrieve assessment data for a specific entity or group as records.
+        Prefer get_assessment_frame when a DataFrame is needed.
+
+        Parameters:
+        entity_or_group (str): The name of the entity or group.
+        is_group (bool): Whether to filter by group or entity.
+
+        Returns:
+        List[Tuple]: A list of Assessment named tuples, one per row, with spaces in the
+        column names replaced by underscores (e.g. record.Entity_Name).
+        """
+        key = (entity_or_group, is_group)
+        if key in self._records_cache:
+            return self._records_cache[key]
         logger.debug(f"Getting assessment data for {'group' if is_group else 'entity'}: {entity_or_group}")
-        if is_group:
-            data = self.data[self.data['Group Names'] == entity_or_group]
-        else:
-            data = self.data[self.data['Entity Name'] == entity_or_group]
-        
-        result = data.to_dict('records')
+        frame = self.get_assessment_frame(entity_or_group, is_group)
+        result = list(map(self._record_type._make, frame.itertuples(index=False, name=None)))
         logger.debug(f"Assessment data retrieved. Number of records: {len(result)}")
+        self._records_cache[key] = result
         return result
 
     def get_progress(self, entity_or_group: str, is_group: bool = False) -> pd.Series:
@@ -98,8 +358,7 @@ class DataProcessor:
         pd.Series: A series containing the progress data.
         """
         logger.debug(f"Getting progress for {'group' if is_group else 'entity'}: {entity_or_group}")
-        data = pd.DataFrame(self.get_assessment_data(entity_or_group, is_group))
-        return data.groupby('Assessment Number')['Rating'].mean()
+        return self._compute_all(entity_or_group, is_group)['progress']
 
     def get_capability_scores(self, entity_or_group: str, is_group: bool = False) -> Dict[str, float]:
         """
@@ -113,8 +372,7 @@ class DataProcessor:
         Dict[str, float]: A dictionary containing the capability scores.
         """
         logger.debug(f"Getting capability scores for {'group' if is_group else 'entity'}: {entity_or_group}")
-        data = pd.DataFrame(self.get_assessment_data(entity_or_group, is_group))
-        return data.groupby('Capability Name')['Rating'].mean().to_dict()
+        return self._compute_all(entity_or_group, is_group)['capability_scores']
 
     def get_criteria_distribution(self, entity_or_group: str, is_group: bool = False) -> Dict[str, int]:
         """
@@ -128,10 +386,9 @@ class DataProcessor:
         Dict[str, int]: A dictionary containing the criteria distribution.
         """
         logger.debug(f"Getting criteria distribution for {'group' if is_group else 'entity'}: {entity_or_group}")
-        data = pd.DataFrame(self.get_assessment_data(entity_or_group, is_group))
-        return data['Criteria Stage'].value_counts().to_dict()
+        return self._compute_all(entity_or_group, is_group)['criteria_distribution']
 
-    def get_notes(self, entity_or_group: str, is_group: bool = False) -> List[str]:
+    def get_notes(self, entity_or_group: str, is_group: bool = False) -> np.ndarray:
         """
         Retrieve notes for a specific entity or group.
 
@@ -140,13 +397,12 @@ class DataProcessor:
         is_group (bool): Whether to filter by group or entity.
 
         Returns:
-        List[str]: A list of notes.
+        np.ndarray: An array of notes.
         """
         logger.debug(f"Getting notes for {'group' if is_group else 'entity'}: {entity_or_group}")
-        data = pd.DataFrame(self.get_assessment_data(entity_or_group, is_group))
-        return data['Notes'].dropna().tolist()
+        return self._compute_all(entity_or_group, is_group)['notes']
 
-    def get_assessment_dates(self, entity_or_group: str, is_group: bool = False) -> List[str]:
+    def get_assessment_dates(self, entity_or_group: str, is_group: bool = False) -> np.ndarray:
         """
         Retrieve assessment dates for a specific entity or group.
 
@@ -155,13 +411,12 @@ class DataProcessor:
         is_group (bool): Whether to filter by group or entity.
 
         Returns:
-        List[str]: A list of unique assessment dates.
+        np.ndarray: An array of unique assessment dates.
         """
         logger.debug(f"Getting assessment dates for {'group' if is_group else 'entity'}: {entity_or_group}")
-        data = pd.DataFrame(self.get_assessment_data(entity_or_group, is_group))
-        return data['Assessment Date'].unique().tolist()
+        return self._compute_all(entity_or_group, is_group)['assessment_dates']
 
-    def get_template_names(self, entity_or_group: str, is_group: bool = False) -> List[str]:
+    def get_template_names(self, entity_or_group: str, is_group: bool = False) -> np.ndarray:
         """
         Retrieve template names for a specific entity or group.
 
@@ -170,113 +425,94 @@ class DataProcessor:
         is_group (bool): Whether to filter by group or entity.
 
         Returns:
-        List[str]: A list of unique template names.
+        np.ndarray: An array of unique template names.
         """
         logger.debug(f"Getting template names for {'group' if is_group else 'entity'}: {entity_or_group}")
-        data = pd.DataFrame(self.get_assessment_data(entity_or_group, is_group))
-        return data['Template Name'].unique().tolist()
+        return self._compute_all(entity_or_group, is_group)['template_names']
     
-    def generate_analysis_prompt(self, group_or_entity: str, name: str) -> str:
+    def generate_analysis_prompt(self, group_or_entity: str, name: str, structured: bool = True) -> str:
         """
         Generate a detailed analysis prompt based on the data for a specific group or entity.
 
         Parameters:
         group_or_entity (str): The type of analysis to generate (e.g., group or entity).
         name (str): The name of the group or entity.
+        structured (bool): Whether to ask for a trailing 'Sentiment:' line after the analysis,
+            so one call covers both the analysis and the sentiment.
 
         Returns:
         str: The generated analysis prompt.
         """
         logger.debug(f"Generating analysis prompt for {group_or_entity}: {name}")
-        assessment_data = pd.DataFrame(self.get_assessment_data(name, is_group=(group_or_entity == "Group")))
-        
-        prompt = f"""
-        Analyze the following assessment data for {group_or_entity}: {name}
-        Group: {assessment_data['Group Names'].iloc[0]}
-
-        Template Name(s): {', '.join(self.get_template_names(name, group_or_entity == "Group"))}
-        Assessment Date(s): {', '.join(self.get_assessment_dates(name, group_or_entity == "Group"))}
-        Assessment Number(s): {', '.join(map(str, assessment_data['Assessment Number'].unique()))}
-        Total Number of Assessments Analyzed: {len(assessment_data['Assessment Number'].unique())}
-
-        Please provide the following analysis in this order:
-
-        1. Comprehensive Notes Summary and Sentiment Analysis:
-        Start with a detailed summary of all notes across all capabilities and assessments. This should include:
-        - A chronological overview of the notes, highlighting key themes and changes over time
-        - Direct quotes from the notes that illustrate important points or shifts in focus
-        - An analysis of the overall sentiment in the notes, including how it has changed over time
-        - Specific examples of positive and negative sentiments, supported by quotes
-        - An interpretation of what these sentiments suggest about the entity's progress and challenges
-        If there are no notes for a particular capability or assessment, mention this fact in your analysis.
-
-        2. A concise summary of the overall performance across all capabilities, highlighting key improvements and areas of concern.
-
-        3. A focused analysis of progress over time, mentioning only capabilities with significant changes.
-
-        4. Top 3 strengths and top 3 areas for improvement, based on the most recent ratings and progress over time.
-
-        5. Detailed Analysis of Capabilities with Notes:
-        For each capability with notes, provide:
-        - The capability name and its most recent rating
-        - A chronological summary of all notes for this capability, including direct quotes
-        - Your interpretation of how the notes relate to the rating and how they've changed over time
-        - A specific recommendation based on the notes and rating
-
-        6. Summary Analysis of Capabilities without Notes:
-        For capabilities without notes, provide:
-        - The capability name and its most recent rating
-        - An analysis based on the criteria for the current score and what's needed for a higher score
-        - A specific recommendation for improvement
-
-        7. 3-5 specific, actionable recommendations for future focus areas, based on the identified weaknesses and the content of the notes.
-
-        Capabilities with notes:
-        """
-
-        for capability, group in assessment_data.groupby('Capability Name'):
-            notes = group[['Assessment Number', 'Assessment Date', 'Notes']].dropna(subset=['Notes'])
-            if not notes.empty:
-                prompt += f"""
-                Capability: {capability}
-                Most Recent Rating: {group['Rating'].iloc[-1]:.2f}
-                Notes Over Time:
-                """
-                for _, row in notes.iterrows():
-                    prompt += f"""
-                    Assessment Number: {row['Assessment Number']}
-                    Date: {row['Assessment Date']}
-                    Notes: {row['Notes']}
-                    """
-                prompt += f"""
-                Criteria: {'; '.join(group['Criteria'].unique())}
-                Criteria Stage: {', '.join(group['Criteria Stage'].unique())}
-
-                """
-
-        prompt += """
-        Capabilities without notes:
-        """
-
-        for capability, group in assessment_data.groupby('Capability Name'):
-            if group['Notes'].isna().all():
-                prompt += f"""
-                Capability: {capability}
-                Most Recent Rating: {group['Rating'].iloc[-1]:.2f}
-                Criteria: {'; '.join(group['Criteria'].unique())}
-                Criteria Stage: {', '.join(group['Criteria Stage'].unique())}
-
-                """
-
-        prompt += """
-        Please provide a focused analysis based on this data, avoiding redundancies and emphasizing insights from the notes and criteria. 
-        Ensure that your analysis includes specific ratings, meaningful quotes from notes where available, and clear, actionable recommendations.
-        For capabilities without notes, base your analysis on the criteria and current rating, explaining what's needed for improvement.
-        
-        In the Comprehensive Notes Summary and Sentiment Analysis section, provide a detailed overview of all notes, their sentiment, and how they've evolved over time. 
-        Use specific quotes to support your analysis and highlight any significant trends or changes in sentiment across different capabilities and assessments.
-        If a capability has no notes, include this information in your analysis and consider what this lack of notes might imply.
-        """
-
+        key = (group_or_entity, name, structured)
+        if key in self._prompt_cache:
+            logger.debug("Analysis prompt served from cache")
+            return self._prompt_cache[key]
+
+        is_group = group_or_entity == "Group"
+        assessment_data = self.get_assessment_frame(name, is_group)
+        summary = self._compute_all(name, is_group)
+
+        assessment_numbers = assessment_data['Assessment Number'].unique()
+        parts: List[str] = [_PROMPT_HEADER.format(
+            group_or_entity=group_or_entity,
+            name=name,
+            group=assessment_data['Group Names'].iloc[0],
+            templates=', '.join(summary['template_names']),
+            dates=', '.join(summary['assessment_dates']),
+            numbers=', '.join(map(str, assessment_numbers)),
+            total=len(assessment_numbers),
+        )]
+
+        # Route each capability in a single groupby pass; the sections are emitted in order afterwards
+        with_notes: List[str] = []
+        without_notes: List[str] = []
+        # Group on the name-sorted capability codes so sections come out in name order,
+        # whatever the category order of a dictionary-encoded column
+        rows = self._rows(name, is_group)
+        codes = self._capability_codes[rows]
+        # Most recent rating per capability in one compiled pass over the slice
+        latest_ratings = latest_by_code(codes, self._ratings[rows], len(self._capabilities))
+        # Rows without a capability have code -1; drop them as grouping on the column did
+        known = codes >= 0
+        if not known.all():
+            assessment_data, codes = assessment_data[known], codes[known]
+        # Partition the noted rows by capability once instead of scanning every group for notes
+        has_notes = assessment_data['Notes'].notna().to_numpy()
+        notes_by_capability = dict(tuple(assessment_data[has_notes].groupby(codes[has_notes])))
+
+        for code, group in assessment_data.groupby(codes):
+            capability = self._capabilities[code]
+            capability_header = _CAPABILITY_HEADER.format(capability=capability, rating=latest_ratings[code])
+            criteria = _CRITERIA.format(
+                criteria='; '.join(group['Criteria'].unique()),
+                stages=', '.join(group['Criteria Stage'].unique()),
+            )
+            notes = notes_by_capability.get(code)
+            if notes is not None:
+                with_notes.append(capability_header)
+                with_notes.append(_NOTES_HEADER)
+                with_notes.extend(
+                    _NOTE_ENTRY.format(number=number, date=date, note=note)
+                    for number, date, note in zip(
+                        notes['Assessment Number'].to_numpy(),
+                        notes['Assessment Date'].to_numpy(),
+                        notes['Notes'].to_numpy(),
+                    )
+                )
+                with_notes.append(criteria)
+            else:
+                without_notes.append(capability_header)
+                without_notes.append(criteria)
+
+        parts.extend(with_notes)
+        parts.append(_WITHOUT_NOTES_HEADER)
+        parts.extend(without_notes)
+        parts.append(_PROMPT_FOOTER)
+        if structured:
+            parts.append(_STRUCTURED_RESPONSE)
+
+        prompt = "".join(parts)
+        self._prompt_cache[key] = prompt
         logger.debug("Analysis prompt generated successfully")
         return prompt
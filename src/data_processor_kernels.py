@@ -0,0 +1,73 @@
+import numpy as np
+from numba import njit
+
+# Explicit signatures compile the kernels eagerly at import (or load them from the on-disk cache),
+# so the first DataProcessor call does not pay the JIT cost. Codes are the intp arrays from pd.factorize.
+
+@njit("int64[:](int64[:], int64)", cache=True, nogil=True)
+def count_by_code(codes, n_codes):
+    """
+    Count the rows for each code.
+
+    Parameters:
+    codes (np.ndarray): Integer group codes per row; negative codes are skipped.
+    n_codes (int): The number of distinct codes.
+
+    Returns:
+    np.ndarray: The number of rows for each code.
+    """
+    out = np.zeros(n_codes, dtype=np.int64)
+    for i in range(codes.size):
+        if codes[i] >= 0:
+            out[codes[i]] += 1
+    return out
+
+@njit("float64[:](int64[:], float64[:], int64)", cache=True, nogil=True)
+def mean_by_code(codes, values, n_codes):
+    """
+    Average the values for each code, ignoring NaN values.
+
+    Parameters:
+    codes (np.ndarray): Integer group codes per row; negative codes are skipped.
+    values (np.ndarray): The values per row.
+    n_codes (int): The number of distinct codes.
+
+    Returns:
+    np.ndarray: The mean value for each code, NaN where a code has no values.
+    """
+    # Kahan-compensated sums, as pandas uses for groupby means
+    sums = np.zeros(n_codes)
+    compensation = np.zeros(n_codes)
+    counts = np.zeros(n_codes, dtype=np.int64)
+    for i in range(codes.size):
+        code = codes[i]
+        if code >= 0 and not np.isnan(values[i]):
+            y = values[i] - compensation[code]
+            t = sums[code] + y
+            compensation[code] = (t - sums[code]) - y
+            sums[code] = t
+            counts[code] += 1
+    out = np.full(n_codes, np.nan)
+    for j in range(n_codes):
+        if counts[j] > 0:
+            out[j] = sums[j] / counts[j]
+    return out
+
+@njit("float64[:](int64[:], float64[:], int64)", cache=True, nogil=True)
+def latest_by_code(codes, values, n_codes):
+    """
+    Return the last value seen for each code, in row order.
+
+    Parameters:
+    codes (np.ndarray): Integer group codes per row; negative codes are skipped.
+    values (np.ndarray): The values per row.
+    n_codes (int): The number of distinct codes.
+
+    Returns:
+    np.ndarray: The most recent value for each code, NaN where a code never occurs.
+    """
+    out = np.full(n_codes, np.nan)
+    for i in range(codes.size):
+        if codes[i] >= 0:
+            out[codes[i]] = values[i]
+    return out
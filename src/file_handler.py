@@ -2,7 +2,7 @@ import os
 import io
 import pandas as pd
 from azure.storage.blob import BlobServiceClient
-from azure.identity import DefaultAzureCredential
+from azure.identity import AzureCliCredential, ChainedTokenCredential, EnvironmentCredential, ManagedIdentityCredential
 from dotenv import load_dotenv
 from azure.core.exceptions import ResourceNotFoundError, AzureError
 
@@ -12,8 +12,14 @@ load_dotenv()
 AZURE_BLOB_ACCOUNT_URL = os.getenv("AZURE_BLOB_ACCOUNT_URL")
 AZURE_BLOB_CONTAINER_NAME = os.getenv("AZURE_BLOB_CONTAINER_NAME")
 
+# Number of parallel range requests used when downloading a blob
+DOWNLOAD_CONCURRENCY = 8
+
+# Only try the credential sources the app is deployed with, skipping DefaultAzureCredential's slow fallbacks
+credential = ChainedTokenCredential(EnvironmentCredential(), ManagedIdentityCredential(), AzureCliCredential())
+
 # Create clients at the module level
-blob_service_client = BlobServiceClient(account_url=AZURE_BLOB_ACCOUNT_URL, credential=DefaultAzureCredential())
+blob_service_client = BlobServiceClient(account_url=AZURE_BLOB_ACCOUNT_URL, credential=credential)
 container_client = blob_service_client.get_container_client(AZURE_BLOB_CONTAINER_NAME)
 
 class FileHandler:
@@ -50,9 +56,11 @@ class FileHandler:
         """
         try:
             blob_client = container_client.get_blob_client(file_name)
-            blob_data = blob_client.download_blob()
-            excel_data = io.BytesIO(blob_data.readall())
-            return pd.read_excel(excel_data)
+            excel_data = io.BytesIO()
+            blob_client.download_blob(max_concurrency=DOWNLOAD_CONCURRENCY).readinto(excel_data)
+            excel_data.seek(0)
+            # openpyxl is loaded read-only by pandas, streaming rows instead of building the full workbook
+            return pd.read_excel(excel_data, engine='openpyxl')
         except ResourceNotFoundError:
             raise FileNotFoundError(f"The file {file_name} was not found in the blob storage.")
         except AzureError as e:
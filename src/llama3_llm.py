@@ -1,10 +1,15 @@
 import os
+import json
+import asyncio
+import threading
 import requests
 import logging
-from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pydantic import BaseModel, PrivateAttr
 from langchain.llms.base import LLM
-from langchain.callbacks.manager import CallbackManagerForLLMRun
-from typing import Any, List, Mapping, Optional
+from langchain.callbacks.manager import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 from dotenv import load_dotenv
 
 logging.basicConfig(level=logging.INFO)
@@ -15,12 +20,36 @@ load_dotenv()
 LLAMA3_API_ENDPOINT = os.getenv("LLAMA3_API_ENDPOINT")
 LLAMA3_API_KEY = os.getenv("LLAMA3_API_KEY")
 
+# Retry transient failures with jittered exponential backoff, honouring Retry-After on 429/503.
+# Read errors are not retried: a timed-out POST may still be generating and would be billed again
+_RETRY = Retry(
+    total=5,
+    read=0,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['POST'],
+    raise_on_status=False,
+)
+
+# Share one pooled session at the module level so calls reuse open connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_RETRY)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+_TIMEOUT = (5, 120)
+
+# Cap in-flight requests so bursts of cache misses do not trip the rate limit themselves
+_SEMAPHORE = threading.BoundedSemaphore(4)
+
 class Llama3LLM(LLM, BaseModel):
     """
     A class to interact with the Llama3 language model API.
     """
     endpoint: str = LLAMA3_API_ENDPOINT
     api_key: str = LLAMA3_API_KEY
+    _headers: Dict[str, str] = PrivateAttr()
+    _payload_template: Dict[str, Any] = PrivateAttr()
 
     def __init__(self, **data: Any):
         """
@@ -32,6 +61,16 @@ class Llama3LLM(LLM, BaseModel):
         super().__init__(**data)
         if not self.endpoint or not self.api_key:
             raise ValueError("LLAMA3_API_ENDPOINT and LLAMA3_API_KEY environment variables must be set")
+        # The request envelope is fixed per instance; only the prompt changes between calls
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+            "x-ms-version": "2023-11-03"  # Use the latest API version
+        }
+        self._payload_template = {
+            "temperature": 0.7,
+            "max_tokens": 2000
+        }
 
     @property
     def _llm_type(self) -> str:
@@ -43,6 +82,45 @@ class Llama3LLM(LLM, BaseModel):
         """
         return "Llama3"
 
+    def _build_request(self, prompt: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """
+        Build the headers and JSON payload for a Llama3 API request from the
+        envelope prepared in __init__.
+
+        Parameters:
+        prompt (str): The prompt to send to the Llama3 API.
+
+        Returns:
+        Tuple[Dict[str, str], Dict[str, Any]]: The request headers and payload.
+        """
+        data = {"messages": [{"role": "user", "content": prompt}], **self._payload_template}
+        return self._headers, data
+
+    def _raise_api_error(self, e: requests.exceptions.RequestException,
+                         response: Optional[requests.Response]) -> None:
+        """
+        Translate a failed API request into a ValueError.
+
+        Parameters:
+        e (requests.exceptions.RequestException): The exception raised by the request.
+        response (Optional[requests.Response]): The response, if one was received.
+
+        Raises:
+        ValueError: Always, with a message describing the failure.
+        """
+        logger.error(f"API call failed: {str(e)}")
+        # Response.__bool__ is response.ok, so compare with None to keep error responses
+        if response is not None:
+            if response.status_code == 400:
+                raise ValueError("Bad request. Please check the parameters.")
+            elif response.status_code == 401:
+                raise ValueError("Authentication failed. Please check your API key.")
+            elif response.status_code == 429:
+                raise ValueError("Rate limit exceeded. Please try again later.")
+            elif response.status_code == 500:
+                raise ValueError("Internal server error. Please try again later.")
+        raise ValueError(f"API call failed with an unknown error: {str(e)}")
+
     def _call(self, prompt: str, stop: Optional[List[str]] = None,
               run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
         """
@@ -59,33 +137,80 @@ class Llama3LLM(LLM, BaseModel):
         Raises:
         ValueError: If the API call fails.
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "x-ms-version": "2023-11-03"  # Use the latest API version
-        }
-        data = {
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7,
-            "max_tokens": 2000
-        }
+        headers, data = self._build_request(prompt)
         response = None
         try:
-            response = requests.post(self.endpoint, json=data, headers=headers)
+            with _SEMAPHORE:
+                response = _SESSION.post(self.endpoint, json=data, headers=headers, timeout=_TIMEOUT)
             response.raise_for_status()
             return response.json()["choices"][0]["message"]["content"]
         except requests.exceptions.RequestException as e:
-            logger.error(f"API call failed: {str(e)}")
-            if response:
-                if response.status_code == 400:
-                    raise ValueError("Bad request. Please check the parameters.")
-                elif response.status_code == 401:
-                    raise ValueError("Authentication failed. Please check your API key.")
-                elif response.status_code == 429:
-                    raise ValueError("Rate limit exceeded. Please try again later.")
-                elif response.status_code == 500:
-                    raise ValueError("Internal server error. Please try again later.")
-            raise ValueError(f"API call failed with an unknown error: {str(e)}")
+            self._raise_api_error(e, response)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None,
+                     run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        """
+        Make a non-blocking call to the Llama3 API with the provided prompt.
+        The request runs on a worker thread over the shared session, so concurrent
+        calls overlap their network round-trips.
+
+        Parameters:
+        prompt (str): The prompt to send to the Llama3 API.
+        stop (Optional[List[str]]): List of stop sequences for the API call.
+        run_manager (Optional[AsyncCallbackManagerForLLMRun]): Optional callback manager for the API call.
+
+        Returns:
+        str: The response from the Llama3 API.
+
+        Raises:
+        ValueError: If the API call fails.
+        """
+        # The async run manager has no sync counterpart here, and _call emits no callbacks
+        return await asyncio.to_thread(self._call, prompt, stop, **kwargs)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[str]:
+        """
+        Stream a response from the Llama3 API, yielding content as it arrives.
+
+        Parameters:
+        prompt (str): The prompt to send to the Llama3 API.
+        stop (Optional[List[str]]): List of stop sequences for the API call.
+        run_manager (Optional[CallbackManagerForLLMRun]): Optional callback manager notified of each token.
+
+        Yields:
+        str: Chunks of the response content from the Llama3 API.
+
+        Raises:
+        ValueError: If the API call fails.
+        """
+        headers, data = self._build_request(prompt)
+        data["stream"] = True
+        # The connection stays busy until the stream ends, so hold a slot for the whole response
+        with _SEMAPHORE:
+            response = None
+            try:
+                response = _SESSION.post(self.endpoint, json=data, headers=headers, timeout=_TIMEOUT, stream=True)
+                response.raise_for_status()
+                # SSE is UTF-8 by spec; without a charset requests would fall back to ISO-8859-1
+                response.encoding = 'utf-8'
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    chunk = line[len("data:"):].strip()
+                    if chunk == "[DONE]":
+                        break
+                    choices = json.loads(chunk).get("choices") or [{}]
+                    token = choices[0].get("delta", {}).get("content")
+                    if token:
+                        if run_manager:
+                            run_manager.on_llm_new_token(token)
+                        yield token
+            except requests.exceptions.RequestException as e:
+                self._raise_api_error(e, response)
+            finally:
+                if response is not None:
+                    response.close()
 
     @property
     def _identifying_params(self) -> Mapping[str, Any]:
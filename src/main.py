@@ -1,9 +1,12 @@
 import os
 import sys
 import io
+import tempfile
+from pathlib import Path
+from typing import Dict
 import pandas as pd
-from azure.storage.blob import BlobServiceClient
-from azure.identity import DefaultAzureCredential
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 from dotenv import load_dotenv
 import streamlit as st
 import logging
@@ -23,6 +26,15 @@ AZURE_BLOB_CONTAINER_NAME = os.getenv('AZURE_BLOB_CONTAINER_NAME')
 LLAMA3_API_ENDPOINT = os.getenv('LLAMA3_API_ENDPOINT')
 LLAMA3_API_KEY = os.getenv('LLAMA3_API_KEY')
 
+# Low-cardinality columns stored as categoricals to cut memory and speed up grouping
+CATEGORICAL_COLUMNS = ['Group Names', 'Entity Name', 'Capability Name', 'Template Name', 'Criteria Stage']
+
+# Free-text columns are read as strings as-is; pyarrow would otherwise parse ISO dates into date objects
+TEXT_COLUMNS = ['Assessment Date', 'Notes', 'Comments', 'Criteria']
+
+# Parsed uploads are kept as parquet so reloads skip the CSV parse
+PARQUET_CACHE_DIR = Path(tempfile.gettempdir()) / 'assessment_cache'
+
 # Verify environment variables are loaded
 logger.info(f"AZURE_BLOB_ACCOUNT_URL: {AZURE_BLOB_ACCOUNT_URL}")
 logger.info(f"AZURE_BLOB_CONTAINER_NAME: {AZURE_BLOB_CONTAINER_NAME}")
@@ -35,9 +47,8 @@ if not all([AZURE_BLOB_ACCOUNT_URL, AZURE_BLOB_CONTAINER_NAME, LLAMA3_API_ENDPOI
 # Add the 'src' directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.file_handler import FileHandler
+from src.file_handler import DOWNLOAD_CONCURRENCY, FileHandler, container_client
 from src.data_processor import DataProcessor
-from src.sentiment_analyzer import SentimentAnalyzer
 from src.summarizer import Summarizer
 from src.llama3_llm import Llama3LLM
 
@@ -45,7 +56,49 @@ from src.llama3_llm import Llama3LLM
 llm = Llama3LLM(endpoint=LLAMA3_API_ENDPOINT, api_key=LLAMA3_API_KEY)
 summarizer = Summarizer(llm)
 
-@st.cache_data
+def read_assessment_csv(source) -> pd.DataFrame:
+    """
+    Parse an assessment CSV with pyarrow's multi-threaded reader.
+
+    Categorical columns are dictionary-encoded while parsing and arrive in pandas
+    as the category dtype. Text columns, including the assessment date, stay strings
+    as with pd.read_csv. Empty strings are read as missing values to match pandas.
+
+    Parameters:
+    source: A path or file-like object containing the CSV data.
+
+    Returns:
+    pd.DataFrame: The parsed assessment data.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        strings_can_be_null=True,
+        column_types={
+            **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+            **{col: pa.string() for col in TEXT_COLUMNS},
+        },
+    )
+    return pa_csv.read_csv(source, convert_options=convert_options).to_pandas()
+
+def blob_version(blob_client) -> str:
+    """
+    Identify the current content of a blob for cache validation.
+
+    The content MD5 is preferred because re-uploading identical bytes keeps it stable,
+    whereas the etag changes on every upload.
+
+    Parameters:
+    blob_client: The blob client for the file.
+
+    Returns:
+    str: A string that changes whenever the blob content changes.
+    """
+    properties = blob_client.get_blob_properties()
+    content_md5 = properties.content_settings.content_md5
+    if content_md5:
+        return bytes(content_md5).hex()
+    return properties.etag.strip('"')
+
+@st.cache_resource
 def load_and_process_data(file_name: str) -> DataProcessor:
     """
     Load and process data from an Azure Blob Storage file.
@@ -58,44 +111,39 @@ def load_and_process_data(file_name: str) -> DataProcessor:
     """
     try:
         logger.debug(f"Loading and processing data from file: {file_name}")
-        blob_service_client = BlobServiceClient(account_url=AZURE_BLOB_ACCOUNT_URL, credential=DefaultAzureCredential())
-        container_client = blob_service_client.get_container_client(AZURE_BLOB_CONTAINER_NAME)
         blob_client = container_client.get_blob_client(file_name)
-        
-        # Download the blob content
-        blob_data = blob_client.download_blob().readall()
+
+        # Reuse the parsed parquet copy if the blob content has not changed
+        version = blob_version(blob_client)
+        cache_path = PARQUET_CACHE_DIR / f"{Path(file_name).name}.parquet"
+        version_path = cache_path.with_suffix('.version')
+        if cache_path.exists() and version_path.exists() and version_path.read_text() == version:
+            data = pd.read_parquet(cache_path)
+            logger.debug(f"Parquet cache read successfully. Shape: {data.shape}")
+            return DataProcessor(data)
+
+        # Download the blob content straight into a file-like object
+        file_like_object = io.BytesIO()
+        blob_client.download_blob(max_concurrency=DOWNLOAD_CONCURRENCY).readinto(file_like_object)
+        file_like_object.seek(0)
         logger.debug("Blob data downloaded successfully")
         
-        # Convert bytes to a file-like object
-        file_like_object = io.BytesIO(blob_data)
-        
         # Read the CSV file
-        data = pd.read_csv(file_like_object)
+        data = read_assessment_csv(file_like_object)
         logger.debug(f"CSV file read successfully. Shape: {data.shape}")
+
+        PARQUET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        data.to_parquet(cache_path, index=False)
+        version_path.write_text(version)
         return DataProcessor(data)
     except Exception as e:
         logger.error(f"Error in load_and_process_data: {str(e)}", exc_info=True)
         raise
 
 @st.cache_data
-def analyze_sentiment(text: str) -> str:
-    """
-    Analyze the sentiment of the provided text.
-    
-    Parameters:
-    text (str): The text to analyze.
-    
-    Returns:
-    str: The sentiment analysis result.
-    """
-    logger.debug("Analyzing sentiment")
-    analyzer = SentimentAnalyzer(llm)
-    return analyzer.analyze(text)
-
-@st.cache_data
-def summarize_data(_processor: DataProcessor, group_or_entity: str, name: str) -> str:
+def summarize_data(_processor: DataProcessor, group_or_entity: str, name: str) -> Dict[str, str]:
     """
-    Generate a summary for the specified group or entity using the data processor.
+    Generate a summary and sentiment analysis for the specified group or entity using the data processor.
     
     Parameters:
     _processor (DataProcessor): An instance of the DataProcessor class to generate the summary.
@@ -103,10 +151,10 @@ def summarize_data(_processor: DataProcessor, group_or_entity: str, name: str) -
     name (str): The name of the group or entity.
     
     Returns:
-    str: The generated summary.
+    Dict[str, str]: The generated 'summary' and 'sentiment'.
     """
     logger.debug(f"Summarizing data for {group_or_entity}: {name}")
-    return summarizer.summarize(_processor, group_or_entity, name)
+    return summarizer.analyze(_processor, group_or_entity, name)
 
 def main():
     """
@@ -142,9 +190,9 @@ def main():
             logger.debug(f"Selected {analysis_type.lower()}: {selected}")
 
             st.subheader(f"Assessment Data for {selected}")
-            assessment_data = processor.get_assessment_data(selected, is_group=(analysis_type == "Group"))
-            logger.debug(f"Assessment data retrieved. Type: {type(assessment_data)}")
-            logger.debug(f"First few rows of assessment data: {assessment_data[:5] if isinstance(assessment_data, list) else assessment_data.head()}")
+            assessment_data = processor.get_assessment_frame(selected, is_group=(analysis_type == "Group"))
+            logger.debug(f"Assessment data retrieved. Number of records: {len(assessment_data)}")
+            logger.debug(f"First few rows of assessment data: {assessment_data.head()}")
             st.dataframe(assessment_data)
 
             progress = processor.get_progress(selected, is_group=(analysis_type == "Group"))
@@ -167,9 +215,12 @@ def main():
 
             st.subheader("Comprehensive Analysis")
             logger.debug("Starting comprehensive analysis")
-            summary = summarize_data(processor, analysis_type, selected)
+            analysis = summarize_data(processor, analysis_type, selected)
             logger.debug("Comprehensive analysis completed")
-            st.write(summary)
+            st.write(analysis['summary'])
+            if analysis['sentiment']:
+                st.subheader("Sentiment")
+                st.write(analysis['sentiment'])
 
         except Exception as e:
             logger.error(f"An error occurred: {str(e)}", exc_info=True)
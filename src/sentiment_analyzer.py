@@ -10,6 +10,19 @@ class SentimentAnalyzer:
         """
         self.llm = llm
 
+    @staticmethod
+    def _build_prompt(text: str) -> str:
+        """
+        Build the sentiment analysis prompt for the provided text.
+
+        Parameters:
+        text (str): The text to analyze.
+
+        Returns:
+        str: The prompt to send to the language model.
+        """
+        return f"Analyze the sentiment of the following text and categorize it as positive, negative, or neutral. Provide a brief explanation for your categorization:\n\n{text}"
+
     def analyze(self, text: str) -> str:
         """
         Analyze the sentiment of the provided text.
@@ -20,6 +33,18 @@ class SentimentAnalyzer:
         Returns:
         str: The sentiment analysis result.
         """
-        prompt = f"Analyze the sentiment of the following text and categorize it as positive, negative, or neutral. Provide a brief explanation for your categorization:\n\n{text}"
-        response = self.llm._call(prompt)
+        response = self.llm._call(self._build_prompt(text))
+        return response
+
+    async def aanalyze(self, text: str) -> str:
+        """
+        Analyze the sentiment of the provided text without blocking the event loop.
+
+        Parameters:
+        text (str): The text to analyze.
+
+        Returns:
+        str: The sentiment analysis result.
+        """
+        response = await self.llm._acall(self._build_prompt(text))
         return response
@@ -1,9 +1,15 @@
+import re
+import asyncio
 import logging
+from typing import Dict, Iterator, List
 from llama3_llm import Llama3LLM
 from data_processor import DataProcessor
 
 logger = logging.getLogger(__name__)
 
+# The trailing 'Sentiment: ...' line requested by the structured prompt, tolerating markdown emphasis
+_SENTIMENT_LINE = re.compile(r'^[\s*_#>-]*sentiment[\s*_]*:[\s*_]*(?P<sentiment>.*?)[\s*_]*$', re.IGNORECASE)
+
 class Summarizer:
     def __init__(self, llm: Llama3LLM):
         """
@@ -14,9 +20,29 @@ class Summarizer:
         """
         self.llm = llm
 
-    def summarize(self, data_processor: 'DataProcessor', group_or_entity: str, name: str) -> str:
+    @staticmethod
+    def _parse_response(response: str) -> Dict[str, str]:
         """
-        Generate a summary for the specified group or entity using the data processor.
+        Split a structured LLM response into its summary and sentiment.
+        Responses without the trailing sentiment line, such as ones cut off at the
+        token limit, are used as the summary as-is.
+
+        Parameters:
+        response (str): The raw response from the language model.
+
+        Returns:
+        Dict[str, str]: The 'summary' and 'sentiment' text.
+        """
+        body, _, last_line = response.rstrip().rpartition('\n')
+        match = _SENTIMENT_LINE.match(last_line)
+        if match and match.group('sentiment'):
+            return {'summary': body.rstrip(), 'sentiment': match.group('sentiment')}
+        logger.warning("LLM response had no trailing sentiment line; using it as the summary")
+        return {'summary': response, 'sentiment': ''}
+
+    def analyze(self, data_processor: 'DataProcessor', group_or_entity: str, name: str) -> Dict[str, str]:
+        """
+        Generate a summary and sentiment analysis for the specified group or entity in one LLM call.
 
         Parameters:
         data_processor (DataProcessor): An instance of the DataProcessor class to generate the prompt.
@@ -24,7 +50,7 @@ class Summarizer:
         name (str): The name of the group or entity.
 
         Returns:
-        str: The generated summary from the language model.
+        Dict[str, str]: The 'summary' and 'sentiment' from the language model.
         """
         try:
             logger.debug(f"Generating summary for {group_or_entity}: {name}")
@@ -35,7 +61,87 @@ class Summarizer:
             response = self.llm._call(prompt)
             logger.debug("LLM response received")
             
-            return response
+            return self._parse_response(response)
+        except Exception as e:
+            logger.error(f"Error in analyze method: {str(e)}", exc_info=True)
+            raise
+
+    def summarize(self, data_processor: 'DataProcessor', group_or_entity: str, name: str) -> str:
+        """
+        Generate a summary for the specified group or entity using the data processor.
+
+        Parameters:
+        data_processor (DataProcessor): An instance of the DataProcessor class to generate the prompt.
+        group_or_entity (str): The type of summary to generate (e.g., group or entity).
+        name (str): The name of the group or entity.
+
+        Returns:
+        str: The generated summary from the language model.
+        """
+        return self.analyze(data_processor, group_or_entity, name)['summary']
+
+    async def asummarize(self, data_processor: 'DataProcessor', group_or_entity: str, name: str) -> str:
+        """
+        Generate a summary without blocking the event loop, so it can run alongside other LLM calls.
+
+        Parameters:
+        data_processor (DataProcessor): An instance of the DataProcessor class to generate the prompt.
+        group_or_entity (str): The type of summary to generate (e.g., group or entity).
+        name (str): The name of the group or entity.
+
+        Returns:
+        str: The generated summary from the language model.
+        """
+        try:
+            logger.debug(f"Generating summary asynchronously for {group_or_entity}: {name}")
+            prompt = data_processor.generate_analysis_prompt(group_or_entity, name)
+            logger.debug("Analysis prompt generated successfully")
+
+            response = await self.llm._acall(prompt)
+            logger.debug("LLM response received")
+
+            return self._parse_response(response)['summary']
+        except Exception as e:
+            logger.error(f"Error in asummarize method: {str(e)}", exc_info=True)
+            raise
+
+    async def summarize_batch(self, data_processor: 'DataProcessor', group_or_entity: str, names: List[str]) -> Dict[str, str]:
+        """
+        Generate summaries for several groups or entities concurrently.
+        The LLM round-trips overlap, up to the in-flight limit of the shared Llama3 session.
+
+        Parameters:
+        data_processor (DataProcessor): An instance of the DataProcessor class to generate the prompts.
+        group_or_entity (str): The type of summary to generate (e.g., group or entity).
+        names (List[str]): The names of the groups or entities.
+
+        Returns:
+        Dict[str, str]: The generated summary for each name, in the order given.
+        """
+        logger.debug(f"Generating {len(names)} summaries concurrently for {group_or_entity}")
+        summaries = await asyncio.gather(*(self.asummarize(data_processor, group_or_entity, name) for name in names))
+        return dict(zip(names, summaries))
+
+    def summarize_stream(self, data_processor: 'DataProcessor', group_or_entity: str, name: str) -> Iterator[str]:
+        """
+        Stream a summary for the specified group or entity as the language model produces it.
+
+        Parameters:
+        data_processor (DataProcessor): An instance of the DataProcessor class to generate the prompt.
+        group_or_entity (str): The type of summary to generate (e.g., group or entity).
+        name (str): The name of the group or entity.
+
+        Yields:
+        str: Chunks of the summary from the language model.
+        """
+        try:
+            logger.debug(f"Streaming summary for {group_or_entity}: {name}")
+            # Streamed text is shown as it arrives, so leave out the trailing sentiment line
+            prompt = data_processor.generate_analysis_prompt(group_or_entity, name, structured=False)
+            logger.debug("Analysis prompt generated successfully")
+
+            yield from self.llm._stream(prompt)
+            logger.debug("LLM stream completed")
         except Exception as e:
-            logger.error(f"Error in summarize method: {str(e)}", exc_info=True)
+            logger.error(f"Error in summarize_stream method: {str(e)}", exc_info=True)
             raise
@@ -0,0 +1,5 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path for every test module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
@@ -1,16 +1,15 @@
-import sys
-import os
 import unittest
+from unittest.mock import patch
 
-# Ensure the src directory is in the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
+import numpy as np
 import pandas as pd
 from data_processor import DataProcessor
 
 class TestDataProcessor(unittest.TestCase):
-    def setUp(self):
-        self.data = pd.DataFrame({
+    @classmethod
+    def setUpClass(cls):
+        # The tests only read from the shared frame; variants are built inline from copies
+        cls.data = pd.DataFrame({
             'Group Names': ['Group1', 'Group2'],
             'Entity Name': ['Entity1', 'Entity2'],
             'Capability Name': ['Capability1', 'Capability2'],
@@ -22,7 +21,7 @@ class TestDataProcessor(unittest.TestCase):
             'Criteria': ['Criteria1', 'Criteria2'],
             'Criteria Stage': ['Stage1', 'Stage2']
         })
-        self.processor = DataProcessor(self.data)
+        cls.processor = DataProcessor(cls.data)
 
     def test_validate_data(self):
         # Test for missing columns
@@ -41,12 +40,48 @@ class TestDataProcessor(unittest.TestCase):
     def test_get_assessment_data(self):
         data = self.processor.get_assessment_data('Entity1')
         self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]['Entity Name'], 'Entity1')
+        self.assertEqual(data[0].Entity_Name, 'Entity1')
+        self.assertEqual(data[0]._asdict()['Capability_Name'], 'Capability1')
+
+    def test_aggregations_do_not_build_frame(self):
+        processor = DataProcessor(self.data)
+        processor.get_capability_scores('Entity1')
+        processor.get_notes('Entity1')
+        self.assertEqual(processor._filter_cache, {})
+
+    def test_getters_are_memoized(self):
+        self.assertIs(self.processor.get_assessment_data('Entity1'), self.processor.get_assessment_data('Entity1'))
+        self.assertIs(self.processor.get_capability_scores('Entity1'), self.processor.get_capability_scores('Entity1'))
+        self.assertIs(self.processor.get_progress('Group1', is_group=True), self.processor.get_progress('Group1', is_group=True))
+
+    def test_get_assessment_frame(self):
+        data = self.processor.get_assessment_frame('Entity1')
+        self.assertIsInstance(data, pd.DataFrame)
+        self.assertEqual(data['Entity Name'].tolist(), ['Entity1'])
+
+    def test_get_assessment_frame_non_contiguous_rows(self):
+        data = pd.concat([self.data, self.data], ignore_index=True)
+        processor = DataProcessor(data)
+        frame = processor.get_assessment_frame('Entity1')
+        self.assertEqual(frame.index.tolist(), [0, 2])
+
+    def test_get_assessment_data_unknown_entity(self):
+        data = self.processor.get_assessment_data('Unknown')
+        self.assertEqual(data, [])
 
     def test_get_progress(self):
         progress = self.processor.get_progress('Entity1')
         self.assertEqual(progress.iloc[0], 4.0)
 
+    def test_get_progress_averages_per_assessment(self):
+        data = pd.concat([self.data] * 2, ignore_index=True)
+        data['Entity Name'] = 'Entity1'
+        data['Assessment Number'] = [2, 1, 2, 1]
+        data['Rating'] = [4.0, 3.0, 2.0, float('nan')]
+        progress = DataProcessor(data).get_progress('Entity1')
+        self.assertEqual(progress.index.tolist(), [1, 2])
+        self.assertEqual(progress.tolist(), [3.0, 3.0])
+
     def test_get_capability_scores(self):
         scores = self.processor.get_capability_scores('Entity1')
         self.assertEqual(scores['Capability1'], 4.0)
@@ -57,15 +92,65 @@ class TestDataProcessor(unittest.TestCase):
 
     def test_get_notes(self):
         notes = self.processor.get_notes('Entity1')
-        self.assertEqual(notes, ['Note1'])
+        np.testing.assert_array_equal(notes, ['Note1'])
 
     def test_get_assessment_dates(self):
         dates = self.processor.get_assessment_dates('Entity1')
-        self.assertEqual(dates, ['2023-01-01'])
+        np.testing.assert_array_equal(dates, ['2023-01-01'])
 
     def test_get_template_names(self):
         templates = self.processor.get_template_names('Entity1')
-        self.assertEqual(templates, ['Template1'])
+        np.testing.assert_array_equal(templates, ['Template1'])
+
+    @patch('data_processor.PARALLEL_MIN_ROWS', 0)
+    def test_parallel_aggregations(self):
+        processor = DataProcessor(self.data)
+        self.assertEqual(processor.get_progress('Entity1').iloc[0], 4.0)
+        self.assertEqual(processor.get_capability_scores('Entity1'), {'Capability1': 4.0})
+        self.assertEqual(processor.get_criteria_distribution('Entity1'), {'Stage1': 1})
+
+    def test_generate_analysis_prompt(self):
+        prompt = self.processor.generate_analysis_prompt('Entity', 'Entity1')
+        self.assertIn('Analyze the following assessment data for Entity: Entity1', prompt)
+        self.assertIn('Capability: Capability1', prompt)
+        self.assertIn('Notes: Note1', prompt)
+        self.assertNotIn('Capability2', prompt)
+        self.assertLess(prompt.index('Notes: Note1'), prompt.index('Capabilities without notes:'))
+        self.assertIs(self.processor.generate_analysis_prompt('Entity', 'Entity1'), prompt)
+        self.assertIn('Sentiment: <positive', prompt)
+        self.assertNotIn('Sentiment:', self.processor.generate_analysis_prompt('Entity', 'Entity1', structured=False))
+
+    def test_categorical_columns(self):
+        data = self.data.astype({col: 'category' for col in ['Group Names', 'Entity Name', 'Capability Name', 'Template Name', 'Criteria Stage']})
+        processor = DataProcessor(data)
+
+        self.assertEqual(processor.get_entities(), ['Entity1', 'Entity2'])
+        self.assertEqual(processor.get_capability_scores('Entity1'), {'Capability1': 4.0})
+        self.assertEqual(processor.get_criteria_distribution('Entity1'), {'Stage1': 1})
+        np.testing.assert_array_equal(processor.get_template_names('Entity1'), ['Template1'])
+        self.assertNotIn('Capability2', processor.generate_analysis_prompt('Entity', 'Entity1'))
+
+    def test_categorical_capabilities_in_name_order(self):
+        # Dictionary-encoded uploads list categories in first-appearance order
+        data = self.data.copy()
+        data['Entity Name'] = 'Entity1'
+        data['Capability Name'] = pd.Categorical(['Capability2', 'Capability1'], categories=['Capability2', 'Capability1'])
+        processor = DataProcessor(data)
+
+        self.assertEqual(list(processor.get_capability_scores('Entity1')), ['Capability1', 'Capability2'])
+        prompt = processor.generate_analysis_prompt('Entity', 'Entity1')
+        self.assertLess(prompt.index('Capability: Capability1'), prompt.index('Capability: Capability2'))
+
+    def test_generate_analysis_prompt_skips_missing_capability(self):
+        data = self.data.copy()
+        data['Entity Name'] = 'Entity1'
+        data['Capability Name'] = ['Capability1', None]
+        processor = DataProcessor(data)
+
+        prompt = processor.generate_analysis_prompt('Entity', 'Entity1')
+
+        self.assertEqual(prompt.count('Capability: Capability1'), 1)
+        self.assertNotIn('Criteria2', prompt)
 
     def test_validate_data_accepts_comments_instead_of_notes(self):
         """Test that the validator accepts 'Comments' column instead of 'Notes'"""
@@ -90,6 +175,7 @@ class TestDataProcessor(unittest.TestCase):
         assert 'Notes' in processor.data.columns
         assert 'Comments' not in processor.data.columns
         assert processor.data['Notes'].iloc[0] == 'Test comment'
+        assert 'Comments' in test_data.columns
 
     def test_validate_data_fails_without_notes_or_comments(self):
         """Test that the validator fails when neither Notes nor Comments is present"""
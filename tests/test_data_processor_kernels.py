@@ -0,0 +1,24 @@
+import unittest
+
+import numpy as np
+from data_processor_kernels import count_by_code, latest_by_code, mean_by_code
+
+class TestDataProcessorKernels(unittest.TestCase):
+    def test_count_by_code(self):
+        codes = np.array([0, 2, 0, -1])
+        np.testing.assert_array_equal(count_by_code(codes, 3), [2, 0, 1])
+
+    def test_mean_by_code(self):
+        codes = np.array([0, 1, 0, -1, 1, 2])
+        values = np.array([1.0, 2.0, 3.0, 4.0, np.nan, np.nan])
+        means = mean_by_code(codes, values, 4)
+        np.testing.assert_array_equal(means, [2.0, 2.0, np.nan, np.nan])
+
+    def test_latest_by_code(self):
+        codes = np.array([0, 1, 0, -1, 2])
+        values = np.array([1.0, 2.0, 3.0, 4.0, np.nan])
+        latest = latest_by_code(codes, values, 4)
+        np.testing.assert_array_equal(latest, [3.0, 2.0, np.nan, np.nan])
+
+if __name__ == '__main__':
+    unittest.main()
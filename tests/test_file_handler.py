@@ -1,17 +1,21 @@
-import sys
-import os
 import unittest
 from unittest.mock import patch, MagicMock
 
-# Ensure the src directory is in the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
 from file_handler import FileHandler
 from azure.core.exceptions import ResourceNotFoundError, AzureError
+import numpy as np
 import pandas as pd
 import io
 
 class TestFileHandler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Serialize the workbook once; the openpyxl round-trip dominates the test runtime
+        cls.test_data = pd.DataFrame({"col1": [1, 2], "col2": [3, 4]})
+        excel_buffer = io.BytesIO()
+        cls.test_data.to_excel(excel_buffer, index=False, engine='openpyxl')
+        cls.EXCEL_BYTES = excel_buffer.getvalue()
+
     @patch('file_handler.container_client')
     def test_upload_to_blob_storage(self, mock_container_client):
         mock_blob_client = MagicMock()
@@ -31,16 +35,13 @@ class TestFileHandler(unittest.TestCase):
         mock_blob_client = MagicMock()
         mock_container_client.get_blob_client.return_value = mock_blob_client
         
-        test_data = pd.DataFrame({"col1": [1, 2], "col2": [3, 4]})
-        excel_buffer = io.BytesIO()
-        test_data.to_excel(excel_buffer, index=False)
-        excel_buffer.seek(0)
-        
-        mock_blob_client.download_blob.return_value.readall.return_value = excel_buffer.getvalue()
+        mock_blob_client.download_blob.return_value.readinto.side_effect = lambda stream: stream.write(self.EXCEL_BYTES)
         
         downloaded_data = FileHandler.read_excel_from_blob("test_file.xlsx")
         
-        pd.testing.assert_frame_equal(downloaded_data, test_data)
+        self.assertEqual(list(downloaded_data.columns), list(self.test_data.columns))
+        np.testing.assert_array_equal(downloaded_data.to_numpy(), self.test_data.to_numpy())
+        mock_blob_client.download_blob.assert_called_once_with(max_concurrency=8)
 
         # Test file not found scenario
         mock_blob_client.download_blob.side_effect = ResourceNotFoundError("Blob not found")
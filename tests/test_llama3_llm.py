@@ -1,16 +1,16 @@
-import sys
-import os
+import io
 import unittest
+import asyncio
 from unittest.mock import patch, MagicMock
 import requests
 
-# Ensure the src directory is in the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
+import llama3_llm
 from llama3_llm import Llama3LLM
 
+LLAMA3_TEST_URL = "https://example.com/v1/chat/completions"
+
 class TestLlama3LLM(unittest.TestCase):
-    @patch('requests.post')
+    @patch('llama3_llm._SESSION.post')
     def test_llm_call(self, mock_post):
         mock_response = MagicMock()
         mock_response.json.return_value = {
@@ -31,7 +31,7 @@ class TestLlama3LLM(unittest.TestCase):
         self.assertEqual(call_kwargs['headers']['Content-Type'], "application/json")
         self.assertEqual(call_kwargs['headers']['x-ms-version'], "2023-11-03")
 
-    @patch('requests.post')
+    @patch('llama3_llm._SESSION.post')
     def test_llm_call_failure(self, mock_post):
         mock_post.side_effect = requests.exceptions.RequestException("API call failed")
         
@@ -39,5 +39,131 @@ class TestLlama3LLM(unittest.TestCase):
         with self.assertRaises(ValueError):
             llm._call("Test prompt")
 
+    @patch('llama3_llm._SESSION.post')
+    def test_llm_call_rate_limited(self, mock_post):
+        # With raise_on_status=False the final 429 comes back once the retries run out
+        response = requests.Response()
+        response.status_code = 429
+        response.url = LLAMA3_TEST_URL
+        mock_post.return_value = response
+
+        with self.assertRaisesRegex(ValueError, "Rate limit exceeded"):
+            Llama3LLM()._call("Test prompt")
+
+    @patch('llama3_llm._SESSION.post')
+    def test_llm_acall(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "Test response"}}]
+        }
+        mock_post.return_value = mock_response
+
+        llm = Llama3LLM()
+        response = asyncio.run(llm._acall("Test prompt"))
+
+        self.assertEqual(response, "Test response")
+        mock_post.assert_called_once()
+
+    @patch.object(Llama3LLM, '_call', return_value="Test response")
+    def test_llm_acall_forwards_kwargs(self, mock_call):
+        response = asyncio.run(Llama3LLM()._acall("Test prompt", ["stop"], temperature=0.1))
+
+        self.assertEqual(response, "Test response")
+        mock_call.assert_called_once_with("Test prompt", ["stop"], temperature=0.1)
+
+    @patch('llama3_llm._SESSION.post')
+    def test_llm_stream(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.iter_lines.return_value = [
+            'data: {"choices": [{"delta": {"content": "Test "}}]}',
+            '',
+            'data: {"choices": [{"delta": {"content": "response"}}]}',
+            'data: [DONE]',
+        ]
+        mock_post.return_value = mock_response
+
+        llm = Llama3LLM()
+        chunks = list(llm._stream("Test prompt"))
+
+        self.assertEqual(chunks, ["Test ", "response"])
+        call_kwargs = mock_post.call_args[1]
+        self.assertTrue(call_kwargs['json']['stream'])
+        self.assertTrue(call_kwargs['stream'])
+        mock_response.close.assert_called_once()
+
+    @patch('llama3_llm.requests.request')
+    @patch('llama3_llm.requests.post')
+    @patch('llama3_llm._SESSION.post')
+    def test_session_reuse(self, mock_post, mock_requests_post, mock_requests_request):
+        session = llama3_llm._SESSION
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "Test response"}}]
+        }
+        mock_post.return_value = mock_response
+
+        with patch('llama3_llm.requests.Session') as mock_session_cls:
+            Llama3LLM()._call("First prompt")
+            Llama3LLM()._call("Second prompt")
+
+        # Both instances posted through the one module-level session
+        self.assertIs(llama3_llm._SESSION, session)
+        self.assertIs(mock_post, llama3_llm._SESSION.post)
+        self.assertEqual(mock_post.call_count, 2)
+        mock_session_cls.assert_not_called()
+        mock_requests_post.assert_not_called()
+        mock_requests_request.assert_not_called()
+
+    def test_request_envelope_is_reused(self):
+        llm = Llama3LLM()
+        first_headers, first_data = llm._build_request("First prompt")
+        second_headers, second_data = llm._build_request("Second prompt")
+
+        self.assertIs(first_headers, second_headers)
+        self.assertEqual(first_data['messages'][0]['content'], "First prompt")
+        self.assertEqual(second_data['messages'][0]['content'], "Second prompt")
+        self.assertNotIn('stream', llm._payload_template)
+
+    @patch('llama3_llm._SESSION.post')
+    def test_llm_stream_decodes_utf8(self, mock_post):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'text/event-stream'
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(
+            'data: {"choices": [{"delta": {"content": "café —"}}]}\n\ndata: [DONE]\n'.encode('utf-8')
+        )
+        mock_post.return_value = response
+
+        chunks = list(Llama3LLM()._stream("Test prompt"))
+
+        self.assertEqual(chunks, ["café —"])
+
+    @patch('llama3_llm._SEMAPHORE')
+    @patch('llama3_llm._SESSION.post')
+    def test_llm_stream_holds_semaphore(self, mock_post, mock_semaphore):
+        mock_response = MagicMock()
+        mock_response.iter_lines.return_value = [
+            'data: {"choices": [{"delta": {"content": "Test "}}]}',
+            'data: [DONE]',
+        ]
+        mock_post.return_value = mock_response
+
+        stream = Llama3LLM()._stream("Test prompt")
+        self.assertEqual(next(stream), "Test ")
+        mock_semaphore.__enter__.assert_called_once()
+        mock_semaphore.__exit__.assert_not_called()
+
+        self.assertEqual(list(stream), [])
+        mock_semaphore.__exit__.assert_called_once()
+
+    def test_session_retries_transient_errors(self):
+        for url in (LLAMA3_TEST_URL, LLAMA3_TEST_URL.replace('https://', 'http://')):
+            retry = llama3_llm._SESSION.get_adapter(url).max_retries
+            self.assertIn(429, retry.status_forcelist)
+            self.assertIn('POST', retry.allowed_methods)
+            self.assertFalse(retry.raise_on_status)
+            self.assertEqual(retry.read, 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import io
+import tempfile
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pandas as pd
+import main
+from main import read_assessment_csv
+from data_processor import DataProcessor
+
+CSV_DATA = b"""Group Names,Entity Name,Capability Name,Template Name,Assessment Date,Assessment Number,Rating,Notes,Criteria,Criteria Stage
+Group1,Entity1,Capability1,Template1,2023-01-01,1,4.0,Note1,Criteria1,Stage1
+Group1,Entity1,Capability2,Template1,2023-01-02,2,3.5,,Criteria2,Stage2
+"""
+
+class TestReadAssessmentCsv(unittest.TestCase):
+    def test_read_assessment_csv(self):
+        data = read_assessment_csv(io.BytesIO(CSV_DATA))
+
+        self.assertEqual(data['Assessment Date'].tolist(), ['2023-01-01', '2023-01-02'])
+        self.assertTrue(pd.isna(data['Notes'].iloc[1]))
+        self.assertIsInstance(data['Entity Name'].dtype, pd.CategoricalDtype)
+        self.assertEqual(data['Rating'].tolist(), [4.0, 3.5])
+
+    def test_read_assessment_csv_feeds_analysis_prompt(self):
+        processor = DataProcessor(read_assessment_csv(io.BytesIO(CSV_DATA)))
+
+        prompt = processor.generate_analysis_prompt('Entity', 'Entity1')
+
+        self.assertIn('2023-01-01, 2023-01-02', prompt)
+        self.assertIn('Notes: Note1', prompt)
+
+class TestLoadAndProcessData(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        main.load_and_process_data.clear()
+        self.addCleanup(main.load_and_process_data.clear)
+
+    def test_parquet_cache_reused_until_blob_changes(self):
+        mock_blob_client = MagicMock()
+        mock_blob_client.get_blob_properties.return_value.content_settings.content_md5 = bytearray(b'\x01')
+        mock_blob_client.download_blob.return_value.readinto.side_effect = lambda stream: stream.write(CSV_DATA)
+
+        with patch('main.container_client') as mock_container_client, \
+                patch('main.PARQUET_CACHE_DIR', Path(self.cache_dir.name)):
+            mock_container_client.get_blob_client.return_value = mock_blob_client
+
+            first = main.load_and_process_data('assessments.csv')
+            main.load_and_process_data.clear()
+            second = main.load_and_process_data('assessments.csv')
+            self.assertEqual(mock_blob_client.download_blob.call_count, 1)
+            self.assertEqual(second.get_assessment_dates('Entity1').tolist(), ['2023-01-01', '2023-01-02'])
+            self.assertEqual(second.get_entities(), first.get_entities())
+
+            # A new content hash invalidates the parquet copy
+            mock_blob_client.get_blob_properties.return_value.content_settings.content_md5 = bytearray(b'\x02')
+            main.load_and_process_data.clear()
+            main.load_and_process_data('assessments.csv')
+            self.assertEqual(mock_blob_client.download_blob.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
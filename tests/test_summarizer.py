@@ -1,20 +1,26 @@
-import sys
-import os
 import unittest
-from unittest.mock import MagicMock
-
-# Ensure the src directory is in the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
 
 from summarizer import Summarizer
-from llama3_llm import Llama3LLM
-from data_processor import DataProcessor
+from sentiment_analyzer import SentimentAnalyzer
+
+# Plain stubs avoid the spec introspection of Llama3LLM and DataProcessor on every setUp
+class _StubLLM:
+    def __init__(self):
+        self._call = MagicMock()
+        self._acall = AsyncMock()
+        self._stream = MagicMock()
+
+class _StubDataProcessor:
+    def __init__(self):
+        self.generate_analysis_prompt = MagicMock()
 
 class TestSummarizer(unittest.TestCase):
     def setUp(self):
-        self.mock_llm = MagicMock(spec=Llama3LLM)
+        self.mock_llm = _StubLLM()
         self.summarizer = Summarizer(self.mock_llm)
-        self.mock_data_processor = MagicMock(spec=DataProcessor)
+        self.mock_data_processor = _StubDataProcessor()
 
     def test_summarize(self):
         self.mock_llm._call.return_value = "Test comprehensive analysis"
@@ -26,5 +32,84 @@ class TestSummarizer(unittest.TestCase):
         self.mock_data_processor.generate_analysis_prompt.assert_called_once_with("Group", "TestGroup")
         self.mock_llm._call.assert_called_once_with("Test prompt")
 
+    def test_analyze(self):
+        self.mock_llm._call.return_value = "Test comprehensive analysis\n\nSentiment: Positive - steady progress"
+        self.mock_data_processor.generate_analysis_prompt.return_value = "Test prompt"
+
+        result = self.summarizer.analyze(self.mock_data_processor, "Group", "TestGroup")
+
+        self.assertEqual(result, {"summary": "Test comprehensive analysis", "sentiment": "Positive - steady progress"})
+        self.mock_llm._call.assert_called_once_with("Test prompt")
+
+    def test_analyze_multiline_summary(self):
+        self.mock_llm._call.return_value = "## Strengths\n- good\n\n## Sentiment Analysis\nNotes improve.\n**Sentiment:** positive\n"
+        self.mock_data_processor.generate_analysis_prompt.return_value = "Test prompt"
+
+        result = self.summarizer.analyze(self.mock_data_processor, "Group", "TestGroup")
+
+        self.assertEqual(result, {"summary": "## Strengths\n- good\n\n## Sentiment Analysis\nNotes improve.", "sentiment": "positive"})
+
+    def test_analyze_truncated_response(self):
+        truncated = "## 1. Notes\n- Capability1 improved from 2 to 4, with notes describing"
+        self.mock_llm._call.return_value = truncated
+        self.mock_data_processor.generate_analysis_prompt.return_value = "Test prompt"
+
+        result = self.summarizer.analyze(self.mock_data_processor, "Group", "TestGroup")
+
+        self.assertEqual(result, {"summary": truncated, "sentiment": ""})
+
+    def test_asummarize(self):
+        self.mock_llm._acall.return_value = "Test comprehensive analysis"
+        self.mock_data_processor.generate_analysis_prompt.return_value = "Test prompt"
+
+        result = asyncio.run(self.summarizer.asummarize(self.mock_data_processor, "Group", "TestGroup"))
+
+        self.assertEqual(result, "Test comprehensive analysis")
+        self.mock_llm._acall.assert_awaited_once_with("Test prompt")
+
+    def test_summarize_batch(self):
+        in_flight = []
+        peak = []
+
+        async def fake_acall(prompt):
+            in_flight.append(prompt)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(prompt)
+            return f"Summary of {prompt}"
+
+        self.mock_llm._acall.side_effect = fake_acall
+        self.mock_data_processor.generate_analysis_prompt.side_effect = lambda kind, name: name
+
+        result = asyncio.run(self.summarizer.summarize_batch(self.mock_data_processor, "Group", ["Group1", "Group2", "Group3"]))
+
+        self.assertEqual(result, {"Group1": "Summary of Group1", "Group2": "Summary of Group2", "Group3": "Summary of Group3"})
+        self.assertEqual(self.mock_llm._acall.await_count, 3)
+        self.assertEqual(max(peak), 3)
+
+    def test_summarize_stream(self):
+        self.mock_llm._stream.return_value = iter(["Test ", "analysis"])
+        self.mock_data_processor.generate_analysis_prompt.return_value = "Test prompt"
+
+        result = list(self.summarizer.summarize_stream(self.mock_data_processor, "Group", "TestGroup"))
+
+        self.assertEqual(result, ["Test ", "analysis"])
+        self.mock_data_processor.generate_analysis_prompt.assert_called_once_with("Group", "TestGroup", structured=False)
+        self.mock_llm._stream.assert_called_once_with("Test prompt")
+
+class TestSentimentAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.mock_llm = _StubLLM()
+        self.analyzer = SentimentAnalyzer(self.mock_llm)
+
+    def test_aanalyze(self):
+        self.mock_llm._acall.return_value = "Positive"
+
+        result = asyncio.run(self.analyzer.aanalyze("Great progress"))
+
+        self.assertEqual(result, "Positive")
+        self.mock_llm._acall.assert_awaited_once_with(SentimentAnalyzer._build_prompt("Great progress"))
+        self.assertTrue(SentimentAnalyzer._build_prompt("Great progress").endswith("\n\nGreat progress"))
+
 if __name__ == '__main__':
     unittest.main()